@@ -4,11 +4,10 @@ Introduction to the Monte Carlo method
 """
 
 # Add imports here
-from .montecarlo import *
 from .metropolis import *
+from .metropolis_gpu import *
 from .bitstring import *
 from .ising_hamiltonian import *
-# from .ising_hamiltonian_1d import *
 
 
 # Handle versioneer
@@ -1,7 +1,24 @@
 import numpy as np
-from numpy.testing import assert_almost_equal
 import random
-import copy as cp
+
+
+def int_to_bits(int_index, N):
+    """
+    Unpack the bits of `int_index` into an array of 0's and 1's (most significant bit first)
+
+    Parameters
+    ----------
+    int_index : int
+        integer to unpack, of any size
+    N         : int
+        number of bits
+
+    Returns
+    -------
+    bits : np.array
+        int8 array of 0's and 1's
+    """
+    return np.frombuffer(np.binary_repr(int_index, width=N).encode(), dtype=np.int8) - np.int8(48)
 
 
 class BitString:
@@ -24,11 +41,11 @@ class BitString:
         -------
         """
         self.N = N
-        self.config = np.zeros(N, dtype=int)
+        self.config = np.zeros(N, dtype=np.int8)
         self.n_dim = 2**self.N
 
     def __repr__(self):
-        print(self.config)
+        return "BitString(%s)" % self
 
     def __str__(self):
         return "".join(str(e) for e in self.config)
@@ -42,10 +59,32 @@ class BitString:
         M   : Int, default: 0
             Total number of spin up sites
         """
-        self.config = np.zeros(self.N, dtype=int)
-        randomlist = random.sample(range(0, self.N), M)
-        for i in randomlist:
-            self.config[i] = 1
+        self.config = np.zeros(self.N, dtype=np.int8)
+        self.config[random.sample(range(0, self.N), M)] = 1
+
+    def copy(self):
+        """
+        Return an independent copy of this bit string
+
+        Parameters
+        ----------
+
+        Returns
+        -------
+        out : :class:`BitString`
+            copy with its own configuration array
+        """
+        out = self.__class__.__new__(self.__class__)
+        out.N = self.N
+        out.n_dim = self.n_dim
+        out.config = self.config.copy()
+        return out
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
 
     def __len__(self):
         return len(self.config)
@@ -65,10 +104,7 @@ class BitString:
         Returns
         -------
         """
-        if self.config[i] == 1:
-            self.config[i] = 0
-        else:
-            self.config[i] = 1
+        self.config[i] ^= 1
 
     def get_rand_config(self):
         """
@@ -82,9 +118,7 @@ class BitString:
         config : list[int]
             random bitstring
         """
-        return np.array(
-            [int(i) for i in np.binary_repr(random.randrange(0, self.n_dim), width=self.N)]
-        )
+        return int_to_bits(random.randrange(0, self.n_dim), self.N)
 
     def set_rand_config(self):
         """
@@ -96,11 +130,7 @@ class BitString:
         Returns
         -------
         """
-        self.config = np.array(
-            [
-                int(i) for i in np.binary_repr(random.randrange(0, self.n_dim), width=self.N)
-            ]
-        )
+        self.config = self.get_rand_config()
 
     def set_int_config(self, int_index):
         """
@@ -114,9 +144,7 @@ class BitString:
         Returns
         -------
         """
-        self.config = np.array(
-            [int(i) for i in np.binary_repr(int_index, width=self.N)]
-        )
+        self.config = int_to_bits(int_index, self.N)
 
     def get_magnetization(self):
         """
@@ -145,13 +173,73 @@ class BitString:
         -------
         """
         assert len(conf) == self.N
-        self.config = np.array(conf)
+        self.config = np.array(conf, dtype=np.int8)
 
     def x_gate(self, i):
         self.flip_site(i)
 
     def and_gate(self, conf):
-        out = cp.deepcopy(conf)
-        for i in range(len(self.config)):
-            out.config[i] = int(self.config[i] == 1 & conf.config[i] == 1)
+        out = conf.copy()
+        out.config = self.config & conf.config
+        return out
+
+
+class BitStringBatch:
+    """
+    Batch of `R` bit strings of the same length, stored as one (R, N) array
+    """
+
+    def __init__(self, R, N):
+        """
+        Initialize instance
+
+        Parameters
+        ----------
+        R   : int
+            Number of bit strings (replicas)
+        N   : int
+            Number of sites
+
+        Returns
+        -------
+        """
+        self.R = R
+        self.N = N
+        self.configs = np.zeros((R, N), dtype=np.int8)
+
+    def __len__(self):
+        return self.R
+
+    def __getitem__(self, r):
+        """
+        Return replica `r` as a :class:`BitString` sharing this batch's memory
+        """
+        out = BitString(self.N)
+        out.config = self.configs[r]
         return out
+
+    def set_rand_config(self):
+        """
+        set every configuration to a random configuration
+
+        Parameters
+        ----------
+
+        Returns
+        -------
+        """
+        self.configs[...] = np.random.randint(0, 2, size=self.configs.shape)
+
+    def get_magnetization(self):
+        """
+        Return net magnetization of each configuration
+
+        Parameters
+        ----------
+
+        Returns
+        -------
+        m : np.array
+            magnetization of each replica
+        """
+        return np.sum(2 * self.configs - 1, axis=1)
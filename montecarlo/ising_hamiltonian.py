@@ -1,12 +1,19 @@
-from numba import jit
+from numba import jit, prange
 
 import numpy as np
-import random
-import copy as cp
 import montecarlo
 
+# largest node degree for which the Metropolis sweep uses tabulated acceptance ratios
+LUT_MAX_DEGREE = 8
 
-@jit(nopython=True)
+# largest number of entries (rows * 2 * 2^degree) in a tabulated sweep's lookup table
+LUT_MAX_ENTRIES = 2**16
+
+# smallest batch size, replicas * (bonds + sites), for which energy_batch uses the multithreaded kernel
+PARALLEL_MIN_WORK = 2**16
+
+
+@jit(nopython=True, cache=True, fastmath=True, error_model="numpy", boundscheck=False)
 def delta_e_for_flip_fast(i, config, nodes, J, mu):
     """
     Parameters
@@ -40,6 +47,174 @@ def delta_e_for_flip_fast(i, config, nodes, J, mu):
     return del_e
 
 
+@jit(nopython=True, cache=True, fastmath=True, error_model="numpy", boundscheck=False)
+def metropolis_sweep_fast(config, nbr_ptr, nbr_idx, two_js, two_mu, T, rand_u):
+    """
+    Parameters
+    ----------
+    config   : list
+        list of 0's and 1's, updated in place
+    nbr_ptr  : list
+        offsets into `nbr_idx` and `two_js`; node i owns nbr_ptr[i]:nbr_ptr[i+1]
+    nbr_idx  : list
+        nodes connected to each node, concatenated
+    two_js   : list
+        2*J couplings to connected nodes, concatenated
+    two_mu   : list
+        for each node, twice the strength of local field, 2*mu
+    T        : float
+        Temperature
+    rand_u   : list
+        one uniform random number in [0, 1) for each site
+
+    Returns
+    -------
+    del_E  : float
+        Energy change accumulated over the accepted flips
+    del_M  : int
+        Magnetization change accumulated over the accepted flips
+    """
+    del_E = 0.0
+    del_M = 0
+    for i in range(len(config)):
+        # del_e = -s_i * (sum_j 2 J_ij s_j + 2 mu_i)
+        field = two_mu[i]
+        for k in range(nbr_ptr[i], nbr_ptr[i + 1]):
+            field += two_js[k] * (2 * config[nbr_idx[k]] - 1)
+        s_i = 2 * config[i] - 1
+        del_e = -s_i * field
+
+        if del_e <= 0.0 or rand_u[i] <= np.exp(-del_e / T):
+            config[i] ^= 1
+            del_E += del_e
+            del_M -= 2 * s_i
+    return del_E, del_M
+
+
+@jit(nopython=True, cache=True, fastmath=True, error_model="numpy", boundscheck=False)
+def metropolis_sweep_table(config, nbr_ptr, nbr_idx, table_row, del_e_table, acc_table, rand_u):
+    """
+    Parameters
+    ----------
+    config      : list
+        list of 0's and 1's, updated in place
+    nbr_ptr     : list
+        offsets into `nbr_idx`; node i owns nbr_ptr[i]:nbr_ptr[i+1]
+    nbr_idx     : list
+        nodes connected to each node, concatenated
+    table_row   : list
+        for each node, its row of `del_e_table` and `acc_table`
+    del_e_table : [[[]]]
+        energy change for flipping a site of row t with spin bit c, indexed [t, c, key]
+        where bit k of key is the bit of the k-th neighbour of the site
+    acc_table   : [[[]]]
+        exp(-del_e_table/T), same indexing
+    rand_u      : list
+        one uniform random number in [0, 1) for each site
+
+    Returns
+    -------
+    del_E  : float
+        Energy change accumulated over the accepted flips
+    del_M  : int
+        Magnetization change accumulated over the accepted flips
+    """
+    del_E = 0.0
+    del_M = 0
+    for i in range(len(config)):
+        start = nbr_ptr[i]
+        key = 0
+        for k in range(start, nbr_ptr[i + 1]):
+            key |= config[nbr_idx[k]] << (k - start)
+        c = config[i]
+        t = table_row[i]
+
+        # exp(-del_e/T) >= 1 whenever del_e <= 0, so this also accepts downhill moves
+        if rand_u[i] <= acc_table[t, c, key]:
+            config[i] ^= 1
+            del_E += del_e_table[t, c, key]
+            del_M -= 2 * (2 * c - 1)
+    return del_E, del_M
+
+
+@jit(nopython=True, cache=True, fastmath=True, error_model="numpy", boundscheck=False)
+def metropolis_sweep_table_batch(configs, nbr_ptr, nbr_idx, table_row, del_e_table, Ts, rand_u, E, M):
+    """
+    Parameters
+    ----------
+    configs     : [[]]
+        (R, N) array of 0's and 1's, updated in place
+    nbr_ptr     : list
+        offsets into `nbr_idx`; node i owns nbr_ptr[i]:nbr_ptr[i+1]
+    nbr_idx     : list
+        nodes connected to each node, concatenated
+    table_row   : list
+        for each node, its row of `del_e_table`
+    del_e_table : [[[]]]
+        energy change for flipping a site of row t with spin bit c, indexed [t, c, key]
+    Ts          : list
+        temperature of each replica
+    rand_u      : [[]]
+        (R, N) uniform random numbers in [0, 1)
+    E           : list
+        energy of each replica, updated in place
+    M           : list
+        magnetization of each replica, updated in place
+
+    Returns
+    -------
+    """
+    R, N = configs.shape
+    for r in range(R):
+        config = configs[r]
+        for i in range(N):
+            start = nbr_ptr[i]
+            key = 0
+            for k in range(start, nbr_ptr[i + 1]):
+                key |= config[nbr_idx[k]] << (k - start)
+            c = config[i]
+            del_e = del_e_table[table_row[i], c, key]
+
+            # the energy table is shared by all replicas; exp is only needed uphill
+            if del_e <= 0.0 or rand_u[r, i] <= np.exp(-del_e / Ts[r]):
+                config[i] ^= 1
+                E[r] += del_e
+                M[r] -= 2 * (2 * c - 1)
+
+
+@jit(nopython=True, parallel=True, cache=True, fastmath=True, error_model="numpy", boundscheck=False)
+def energy_batch_fast(configs, bond_i, bond_j, bond_J, mu):
+    """
+    Parameters
+    ----------
+    configs  : [[]]
+        (R, N) array of 0's and 1's
+    bond_i   : list
+        first node of each bond
+    bond_j   : list
+        second node of each bond
+    bond_J   : list
+        J coupling of each bond
+    mu       : list
+        for each node, strength of local field, mu
+
+    Returns
+    -------
+    energy  : list
+        Energy of each configuration, computed in parallel over configurations
+    """
+    R, N = configs.shape
+    energy = np.zeros(R)
+    for r in prange(R):
+        e = 0.0
+        for b in range(len(bond_J)):
+            e += bond_J[b] * (2 * configs[r, bond_i[b]] - 1) * (2 * configs[r, bond_j[b]] - 1)
+        for i in range(N):
+            e += mu[i] * (2 * configs[r, i] - 1)
+        energy[r] = e
+    return energy
+
+
 class IsingHamiltonian:
     """Class for an Ising Hamiltonian of arbitrary dimensionality
 
@@ -57,23 +232,203 @@ class IsingHamiltonian:
             Strength of coupling, e.g,
             [(4, -1.1), (6, -.1)]
             [(5, -1.1), (7, -.1)]
-        mu: vector, optional
-            local fields
+        mu: vector or float, optional
+            local fields; a scalar applies the same field to every site
         """
         self.J = J
         self.mu = mu
 
+    @property
+    def J(self):
+        """Couplings, as a list (one per node) of lists of (node, J) tuples"""
+        return self._J
+
+    @J.setter
+    def J(self, J):
+        if hasattr(self, "_mu") and len(J) != self.N:
+            raise ValueError("J has %i sites but mu has %i; build a new IsingHamiltonian" % (len(J), self.N))
+        self._J = J
+        self.N = len(J)
+
+        # neighbour table: node i owns entries nbr_ptr[i]:nbr_ptr[i+1] of the flat arrays
+        counts = [len(Ji) for Ji in J]
+        self.nbr_ptr = np.zeros(self.N + 1, dtype=int)
+        self.nbr_ptr[1:] = np.cumsum(counts)
+        self.nbr_idx = np.array([j[0] for Ji in J for j in Ji], dtype=int)
+        self.nbr_js = np.array([j[1] for Ji in J for j in Ji], dtype=float)
+        self.two_js = 2 * self.nbr_js
+        # derived tables are cached from these, so they may only change through the setters
+        for a in (self.nbr_ptr, self.nbr_idx, self.nbr_js, self.two_js):
+            a.flags.writeable = False
+        self.max_degree = max(counts, default=0)
+        self.table_row = None
+        self.del_e_table = None
+        self.acc_T = None
+
+        # per-node views into the neighbour table
         self.nodes = []
         self.js = []
+        for i in range(self.N):
+            self.nodes.append(self.nbr_idx[self.nbr_ptr[i]:self.nbr_ptr[i + 1]])
+            self.js.append(self.nbr_js[self.nbr_ptr[i]:self.nbr_ptr[i + 1]])
+
+        # unique bonds (i <= j) for the vectorized energy
+        owner = np.repeat(np.arange(self.N), counts)
+        keep = self.nbr_idx >= owner
+        self.bond_i = owner[keep]
+        self.bond_j = self.nbr_idx[keep]
+        self.bond_J = self.nbr_js[keep]
+        for a in (self.bond_i, self.bond_j, self.bond_J):
+            a.flags.writeable = False
+
+    @property
+    def mu(self):
+        """Local fields, as a read-only contiguous float64 array of length N
+
+        Assign a new array to change the fields; in-place edits would leave the
+        cached `two_mu` stale, so they raise.
+        """
+        return self._mu
+
+    @mu.setter
+    def mu(self, mu):
+        self._mu = np.broadcast_to(np.asarray(mu, dtype=np.float64), (self.N,)).copy()
+        self.two_mu = 2 * self._mu
+        self._mu.flags.writeable = False
+        self.two_mu.flags.writeable = False
+        self.table_row = None
+        self.del_e_table = None
+        self.acc_T = None
+
+    def lookup_rows(self):
+        """Group the sites that share the same couplings and local field
+
+        The energy change of a flip only depends on a site's couplings, its
+        local field and the bits involved, so sites with identical parameters
+        share a row of the lookup tables. A uniform lattice needs a single row.
+        Cached until J or mu is reassigned.
+
+        Parameters
+        ----------
+
+        Returns
+        -------
+        table_row : np.array
+            for each site, the index of its row
+        params    : np.array
+            one row per distinct site: 2*J to each neighbour (zero-padded to
+            `max_degree`) followed by 2*mu
+        """
+        if self.table_row is None:
+            counts = np.diff(self.nbr_ptr)
+            params = np.zeros((self.N, self.max_degree + 1))
+            for i in range(self.N):
+                params[i, :counts[i]] = self.two_js[self.nbr_ptr[i]:self.nbr_ptr[i + 1]]
+            params[:, -1] = self.two_mu
+
+            self.table_params, table_row = np.unique(params, axis=0, return_inverse=True)
+            self.table_row = table_row.reshape(-1)
+            self.table_params.flags.writeable = False
+            self.table_row.flags.writeable = False
+        return self.table_row, self.table_params
+
+    def fits_lookup_table(self):
+        """Whether the lookup tables stay within `LUT_MAX_DEGREE` and `LUT_MAX_ENTRIES`
+
+        Returns
+        -------
+        fits : bool
+        """
+        if self.max_degree > LUT_MAX_DEGREE:
+            return False
+        _, params = self.lookup_rows()
+        return len(params) * 2**(self.max_degree + 1) <= LUT_MAX_ENTRIES
+
+    def delta_e_table(self):
+        """Tabulate the energy change of every possible single flip
+
+        Flipping site i only depends on its own spin and on the spins of its
+        neighbours, so each row of :meth:`lookup_rows` has 2 * 2^degree
+        distinct moves. The table is cached until J or mu is reassigned.
+
+        Parameters
+        ----------
+
+        Returns
+        -------
+        table_row   : np.array
+            for each site, its row of the table
+        del_e_table : np.array
+            energy change, indexed [t, c, key], where t is the row of site i, c is
+            the bit of site i and bit k of key is the bit of the k-th neighbour of i
+        """
+        table_row, params = self.lookup_rows()
+        if self.del_e_table is not None:
+            return table_row, self.del_e_table
+
+        keys = np.arange(2**self.max_degree)
+        sign = 2 * ((keys[:, None] >> np.arange(self.max_degree)) & 1) - 1
+        field = params[:, -1:] + params[:, :-1] @ sign.T
+
+        self.del_e_table = np.stack((field, -field), axis=1)
+        self.del_e_table.flags.writeable = False
+        return table_row, self.del_e_table
 
-        for i in range(len(self.J)):
-            self.nodes.append(np.zeros(len(self.J[i]), dtype=int))
-            self.js.append(np.zeros(len(self.J[i])))
-            for jidx, j in enumerate(self.J[i]):
-                self.nodes[i][jidx] = j[0]
-                self.js[i][jidx] = j[1]
-        self.mu = np.array([i for i in self.mu])
-        self.N = len(self.J)
+    def acceptance_table(self, T):
+        """Tabulate the energy change and acceptance ratio of every possible single flip
+
+        The acceptance ratios are cached for the most recent temperature.
+
+        Parameters
+        ----------
+        T      : float
+            Temperature
+
+        Returns
+        -------
+        table_row   : np.array
+            for each site, its row of the tables
+        del_e_table : np.array
+            energy change, as returned by :meth:`delta_e_table`
+        acc_table   : np.array
+            exp(-del_e_table/T), same indexing
+        """
+        table_row, del_e_table = self.delta_e_table()
+        if self.acc_T != T:
+            self.acc_table = np.exp(-del_e_table / T)
+            self.acc_table.flags.writeable = False
+            self.acc_T = T
+        return table_row, del_e_table, self.acc_table
+
+    def sweep(self, conf, T):
+        """Run one compiled Metropolis sweep over `conf`, in place
+
+        Uses the tabulated acceptance ratios when they fit (see
+        :meth:`fits_lookup_table`), and evaluates exp(-del_e/T) otherwise.
+
+        Parameters
+        ----------
+        conf   : :class:`BitString`
+            input configuration, updated in place
+        T      : float
+            Temperature
+
+        Returns
+        -------
+        del_E  : float
+            Energy change accumulated over the accepted flips
+        del_M  : int
+            Magnetization change accumulated over the accepted flips
+        """
+        rand_u = np.random.random(conf.N)
+        if self.fits_lookup_table():
+            table_row, del_e_table, acc_table = self.acceptance_table(T)
+            return metropolis_sweep_table(
+                conf.config, self.nbr_ptr, self.nbr_idx, table_row, del_e_table, acc_table, rand_u
+            )
+        return metropolis_sweep_fast(
+            conf.config, self.nbr_ptr, self.nbr_idx, self.two_js, self.two_mu, T, rand_u
+        )
 
     def energy(self, config):
         """Compute energy of configuration, `config`
@@ -91,26 +446,38 @@ class IsingHamiltonian:
         energy  : float
             Energy of the input configuration
         """
-        if len(config.config) != len(self.J):
-            error("wrong dimension")
+        cfg = config.config
+        if len(cfg) != self.N:
+            raise ValueError("wrong dimension")
 
-        e = 0.0
-        for i in range(config.N):
-            # print()
-            # print(i)
-            for j in self.J[i]:
-                if j[0] < i:
-                    continue
-                # print(j)
-                if config[i] == config[j[0]]:
-                    e += j[1]
-                else:
-                    e -= j[1]
-
-        e += np.dot(self.mu, 2 * config.config - 1)
+        s = 2 * cfg - 1
+        e = np.dot(self.bond_J, s[self.bond_i] * s[self.bond_j])
+        e += np.dot(self.mu, s)
 
         return e
 
+    def energy_batch(self, confs):
+        """Compute energy of every configuration in `confs`
+
+        Large batches are evaluated by a multithreaded kernel; small ones with
+        NumPy, where starting the threads would cost more than it saves.
+
+        Parameters
+        ----------
+        confs   : :class:`BitStringBatch`
+            input configurations
+
+        Returns
+        -------
+        energy  : np.array
+            Energy of each configuration
+        """
+        if confs.R * (len(self.bond_J) + self.N) >= PARALLEL_MIN_WORK:
+            return energy_batch_fast(confs.configs, self.bond_i, self.bond_j, self.bond_J, self.mu)
+
+        s = 2 * confs.configs - 1
+        return np.einsum("rb,b->r", s[:, self.bond_i] * s[:, self.bond_j], self.bond_J) + s @ self.mu
+
     def delta_e_for_flip(self, i, config):
         """Compute the energy change incurred if one were to flip the spin at site i
 
@@ -123,21 +490,11 @@ class IsingHamiltonian:
 
         Returns
         -------
-        energy  : list[BitString, float]
-            Returns both the flipped config and the energy change
+        del_e  : float
+            Returns the energy change
         """
 
-        del_e = 0.0
-        del_si = 2
-        if config.config[i] == 1:
-            del_si = -2
-
-        for j in self.J[i]:
-            # if config.config[i] == config.config[j[0]]:
-            del_e += (2.0 * config.config[j[0]] - 1.0) * j[1] * del_si
-
-        del_e += self.mu[i] * del_si
-        return del_e
+        return delta_e_for_flip_fast(i, config.config, self.nodes[i], self.js[i], self.mu)
 
     def delta_e_for_flip_slow(self, i, config):
         """Compute the energy change incurred if one were to flip the spin at site i (slow)
@@ -154,7 +511,7 @@ class IsingHamiltonian:
         energy  : list[BitString, float]
             Returns both the flipped config and the energy change
         """
-        config_trial = cp.deepcopy(config)
+        config_trial = config.copy()
         config_trial.flip_site(i)
 
         return self.energy(config_trial) - self.energy(config)
@@ -175,35 +532,43 @@ class IsingHamiltonian:
             Returns updated config
         """
 
-        # print(self.mu)
-        # error('here')
-        for site_i in range(conf.N):
+        self.sweep(conf, T)
+        return conf
 
-            # print(type(self.nodes[site_i]))
-            # print(type(self.js[site_i]))
-            # print(type(self.mu))
-            # error('here')
+    def metropolis_sample(self, conf, T=1.0, nsweep=1000):
+        """Perform `nsweep` sweeps, recording energy and magnetization after each one
 
-            delta_e = delta_e_for_flip_fast(
-                site_i, conf.config, self.nodes[site_i], self.js[site_i], self.mu
-            )
-            # delta_e = self.delta_e_for_flip(site_i, conf)
-
-            # prob_trans = 1.0 # probability of transitioning
-            accept = True
-            if delta_e > 0.0:
-                # prob_trans = np.exp(-delta_e/T)
-                rand_comp = random.random()
-                if rand_comp > np.exp(-delta_e / T):
-                    accept = False
-                # print("nick: %12.8f %12.8f %12s" %(rand_comp, np.exp(-delta_e/T), accept))
-            if accept:
-                if conf.config[site_i] == 0:
-                    conf.config[site_i] = 1
-                else:
-                    conf.config[site_i] = 0
-            # print("%12s %12s deltaE = %12.8f prob = %12.8f" %(conf, accept, delta_e, np.exp(-delta_e/T)))
-        return conf
+        The energy and magnetization are computed once and then updated from the
+        changes accumulated during each sweep, rather than recomputed from scratch.
+
+        Parameters
+        ----------
+        conf   : :class:`BitString`
+            input configuration, updated in place
+        T      : float
+            Temperature
+        nsweep : int
+            Number of sweeps
+
+        Returns
+        -------
+        E_samples : np.array
+            Energy after each sweep
+        M_samples : np.array
+            Magnetization after each sweep
+        """
+        E_samples = np.zeros(nsweep)
+        M_samples = np.zeros(nsweep)
+
+        Ei = self.energy(conf)
+        Mi = conf.get_magnetization()
+        for si in range(nsweep):
+            del_E, del_M = self.sweep(conf, T)
+            Ei += del_E
+            Mi += del_M
+            E_samples[si] = Ei
+            M_samples[si] = Mi
+        return E_samples, M_samples
 
     def compute_average_values(self, T):
         """Compute Average values exactly
@@ -224,90 +589,65 @@ class IsingHamiltonian:
         MS : float
             Magnetic Susceptability
         """
-        E = 0.0
-        M = 0.0
-        Z = 0.0
-        EE = 0.0
-        MM = 0.0
-
-        conf = montecarlo.BitString(self.N)
-
-        for i in range(conf.n_dim):
-            conf.set_int_config(i)
-            Ei = self.energy(conf)
-            Zi = np.exp(-Ei / T)
-            E += Ei * Zi
-            EE += Ei * Ei * Zi
-            Mi = np.sum(2 * conf.config - 1)
-            M += Mi * Zi
-            MM += Mi * Mi * Zi
-            Z += Zi
-
-        E = E / Z
-        M = M / Z
-        EE = EE / Z
-        MM = MM / Z
+        Ei, Mi = self.enumerate_energies()
+        Zi = np.exp(-Ei / T)
+        Z = np.sum(Zi)
+
+        E = np.dot(Ei, Zi) / Z
+        M = np.dot(Mi, Zi) / Z
+        EE = np.dot(Ei * Ei, Zi) / Z
+        MM = np.dot(Mi * Mi, Zi) / Z
 
         HC = (EE - E * E) / (T * T)
         MS = (MM - M * M) / T
         return E, M, HC, MS
 
+    def enumerate_energies(self):
+        """Compute energy and magnetization of every configuration
+
+        Each configuration is packed into the bits of its integer index
+        (site 0 is the most significant bit, as in :meth:`BitString.set_int_config`),
+        so a bond contributes :math:`J_{ij}(1 - 2 (b_i \\oplus b_j))` and all
+        :math:`2^N` states are evaluated with vectorized shift/XOR operations.
+
+        Returns
+        -------
+        E  : np.array
+            Energy of configuration `int_index` for every `int_index`
+        M  : np.array
+            Magnetization of configuration `int_index` for every `int_index`
+        """
+        bits = np.arange(2**self.N, dtype=np.int64)
+        shift = self.N - 1
+
+        E = np.zeros(len(bits))
+        for i, j, Jij in zip(self.bond_i, self.bond_j, self.bond_J):
+            unequal = ((bits >> (shift - i)) ^ (bits >> (shift - j))) & 1
+            E += Jij * (1 - 2 * unequal)
+
+        n_up = np.zeros(len(bits), dtype=np.int64)
+        for i in range(self.N):
+            up = (bits >> (shift - i)) & 1
+            E += self.mu[i] * (2 * up - 1)
+            n_up += up
+
+        M = 2 * n_up - self.N
+        return E, M
 
     def get_lowest_energy_config(self, verbose=0):
         xmin = None     # configuration of minimum energy configuration
         emin = 0        # minimum of energy
-        bs = montecarlo.BitString(self.N)
 
-        for b in range(0,  2**self.N):
-            bs.set_int_config(b)
-            ecurr = self.energy(bs)
-            if verbose > 0:
-                print(" %12.8f %s"%(ecurr, bs))
-            if ecurr < emin:
-                emin = ecurr
-                xmin = b
+        energies, _ = self.enumerate_energies()
+        if verbose > 0:
+            bs = montecarlo.BitString(self.N)
+            for b in range(0,  2**self.N):
+                bs.set_int_config(b)
+                print(" %12.8f %s"%(energies[b], bs))
 
-        return emin, xmin
+        b = np.argmin(energies)
+        if energies[b] < emin:
+            emin = energies[b]
+            xmin = b
 
-# if __name__ == "__main__":
-#     N=10
-#     conf = montecarlo.BitString(N=N)
-#     random.seed(3)
-#     conf.initialize(M=4)
-#     print(conf)
-
-#     Jval = 1.0
-#     muval = 0.2
-
-#     J = []
-#     mu = []
-#     for i in range(N):
-#         J.append([((i+1) % N, Jval), ((i-1) % N, Jval)])
-
-#     for i in range(N):
-#         mu.append(muval)
-
-#     for i in J:
-#         print(i)
-
-#     ham = IsingHamiltonianND(J = J, mu = mu)
-#     ham1d = montecarlo.IsingHamiltonian1D(J = -Jval, mu = muval)
-
-#     print(ham.energy(conf))
-#     print(ham1d.energy(conf))
-#     print()
-#     tmp = cp.deepcopy(conf)
-#     tmp.flip_site(0)
-#     print(tmp)
-#     print(ham.energy(tmp))
-#     print(ham1d.energy(tmp))
-#     print()
-#     print(ham.energy(tmp) - ham.energy(conf))
-#     print(ham1d.energy(tmp) - ham1d.energy(conf))
-#     print(ham.delta_e_for_flip(0,conf)[1])
-#     #print(ham1d.delta_e_for_flip(0,conf)[1])
-#     assert(abs(ham.energy(conf) - ham1d.energy(conf)) < 1e-9)
-#     assert(abs(ham.delta_e_for_flip_slow(0,conf)[1] - ham.delta_e_for_flip(0,conf)[1]) < 1e-9)
-
-#     print(ham.compute_average_values(conf,1.0))
-#     print(ham1d.compute_average_values(conf,1.0))
+        return emin, xmin
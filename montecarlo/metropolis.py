@@ -1,6 +1,6 @@
 import numpy as np
-import copy as cp
-import random
+
+from .ising_hamiltonian import metropolis_sweep_table_batch
 
 
 def metropolis_montecarlo(ham, conf, T=1, nsweep=1000, nburn=100):
@@ -21,48 +21,12 @@ def metropolis_montecarlo(ham, conf, T=1, nsweep=1000, nburn=100):
         Magnetization samples collected
     -------
     """
-    E_samples = np.zeros(nsweep)
-    M_samples = np.zeros(nsweep)
-
     # thermalization
     for si in range(nburn):
         ham.metropolis_sweep(conf, T=T)
 
-
     # accumulation
-    ham.metropolis_sweep(conf, T=T)
-    Ei = ham.energy(conf)
-    Mi = conf.get_magnetization()
-    M_samples[0] = Ei 
-    E_samples[0] = Mi 
-    for si in range(1, nsweep):
-        # conf_proposed = cp.deepcopy(conf)
-        # ham.metropolis_sweep(conf_proposed, T=T)
-        # Eproposed = ham.energy(conf_proposed)
-
-        # # prob_trans = 1.0 # probability of transitioning
-        # delta_e = Eproposed - Ei
-        # accept = True
-        # if delta_e > 0.0:
-        #     rand_comp = random.random()
-        #     if rand_comp > np.exp(-delta_e / T):
-        #         accept = False
-        # if accept:
-        #     conf = conf_proposed
-        #     Ei = ham.energy(conf_proposed)
-        #     Mi = conf.get_magnetization()
-        # conf_proposed = cp.deepcopy(conf)
-        # ham.metropolis_sweep(conf_proposed, T=T)
-        # Eproposed = ham.energy(conf_proposed)
-        
-        ham.metropolis_sweep(conf, T=T)
-
-        Ei = ham.energy(conf)
-        Mi = conf.get_magnetization()
-
-        # Collect 
-        E_samples[si]  = Ei
-        M_samples[si]  = Mi
+    E_samples, M_samples = ham.metropolis_sample(conf, T=T, nsweep=nsweep)
 
     Eavg = np.mean(E_samples)
     Estd = np.std(E_samples) 
@@ -73,6 +37,61 @@ def metropolis_montecarlo(ham, conf, T=1, nsweep=1000, nburn=100):
     print("M(avg): %12.8f ± %5.2e" %(Mavg, Mstd/np.sqrt(nsweep)*3))
     return E_samples, M_samples
 
+def metropolis_montecarlo_batch(ham, confs, T, nsweep=1000, nburn=100):
+    """Run montecarlo with metropolis sampling for a batch of replicas, one per temperature
+
+    All replicas are swept together by one compiled kernel. Energy changes are
+    looked up in the table from :meth:`IsingHamiltonian.delta_e_table`, which is
+    shared by all replicas, so memory does not grow with the number of replicas.
+
+    Parameters
+    ----------
+    ham: IsingHamiltonian, required
+    confs: BitStringBatch, required
+        configurations, updated in place
+    T: list or float, required
+        Temperature of each replica; a scalar applies to every replica
+    nsweep: int, optional
+        Number of sweeps collected
+    nburn: int, optional
+        Number of thermalization sweeps
+
+    Returns
+    -------
+    E_samples: np.array
+        (nsweep, R) energy samples collected
+    M_samples: np.array
+        (nsweep, R) magnetization samples collected
+    """
+    if not ham.fits_lookup_table():
+        raise ValueError("energy lookup table exceeds LUT_MAX_DEGREE or LUT_MAX_ENTRIES")
+
+    T = np.asarray(T, dtype=np.float64)
+    if T.ndim == 0:
+        T = np.full(confs.R, T)
+    if T.shape != (confs.R,):
+        raise ValueError("T has shape %s but confs has %i replicas" % (T.shape, confs.R))
+
+    table_row, del_e_table = ham.delta_e_table()
+
+    E_samples = np.zeros((nsweep, confs.R))
+    M_samples = np.zeros((nsweep, confs.R))
+
+    Ei = ham.energy_batch(confs)
+    Mi = confs.get_magnetization()
+    for si in range(nburn + nsweep):
+        rand_u = np.random.random((confs.R, confs.N))
+        metropolis_sweep_table_batch(
+            confs.configs, ham.nbr_ptr, ham.nbr_idx, table_row, del_e_table, T, rand_u, Ei, Mi
+        )
+
+        if si >= nburn:
+            E_samples[si - nburn] = Ei
+            M_samples[si - nburn] = Mi
+
+    return E_samples, M_samples
+
+
 def running_average(data):
     N = len(data)
     r_avg = np.zeros(N)
@@ -0,0 +1,173 @@
+import math
+
+import numpy as np
+from numba import cuda
+from numba.cuda.random import create_xoroshiro128p_states, xoroshiro128p_uniform_float64
+
+from .bitstring import BitStringBatch
+
+
+def greedy_coloring(ham):
+    """Split the sites of `ham` into classes with no coupling inside a class
+
+    Sites in the same class can be updated concurrently without changing each
+    other's energy change (the checkerboard decomposition for bipartite lattices).
+
+    Parameters
+    ----------
+    ham: IsingHamiltonian, required
+
+    Returns
+    -------
+    color_ptr: np.array
+        offsets into `color_sites`; class c owns color_ptr[c]:color_ptr[c+1]
+    color_sites: np.array
+        sites ordered by class
+    """
+    colors = np.full(ham.N, -1, dtype=int)
+    for i in range(ham.N):
+        taken = {colors[j] for j in ham.nodes[i] if j != i}
+        c = 0
+        while c in taken:
+            c += 1
+        colors[i] = c
+
+    color_sites = np.argsort(colors, kind="stable")
+    color_ptr = np.zeros(colors.max() + 2, dtype=int)
+    color_ptr[1:] = np.cumsum(np.bincount(colors))
+    return color_ptr, color_sites
+
+
+@cuda.jit
+def metropolis_replicas_kernel(configs, nbr_ptr, nbr_idx, two_js, two_mu, Ts,
+                               color_ptr, color_sites, E0, M0, nburn, nsweep,
+                               rng_states, sums):
+    """
+    One block per replica, threads stride over the sites of one color class at a time
+
+    Parameters
+    ----------
+    configs     : [[]]
+        (R, N) array of 0's and 1's, updated in place
+    nbr_ptr, nbr_idx, two_js, two_mu :
+        neighbour table and 2*J, 2*mu of the Hamiltonian
+    Ts          : list
+        temperature of each replica
+    color_ptr, color_sites :
+        color classes from :func:`greedy_coloring`
+    E0, M0      : list
+        energy and magnetization of each replica on entry
+    nburn       : int
+        number of sweeps discarded before accumulating
+    nsweep      : int
+        number of sweeps accumulated
+    rng_states  :
+        one xoroshiro128p state per thread
+    sums        : [[]]
+        (R, 4) array receiving sums of E, E^2, M, M^2 over the accumulated sweeps
+    """
+    r = cuda.blockIdx.x
+    tid = cuda.threadIdx.x
+    nthreads = cuda.blockDim.x
+    gid = r * nthreads + tid
+    T = Ts[r]
+    config = configs[r]
+
+    em = cuda.shared.array(2, dtype=np.float64)
+    if tid == 0:
+        em[0] = E0[r]
+        em[1] = M0[r]
+    cuda.syncthreads()
+
+    for si in range(nburn + nsweep):
+        del_E = 0.0
+        del_M = 0.0
+        for c in range(len(color_ptr) - 1):
+            for k in range(color_ptr[c] + tid, color_ptr[c + 1], nthreads):
+                i = color_sites[k]
+                field = two_mu[i]
+                for n in range(nbr_ptr[i], nbr_ptr[i + 1]):
+                    field += two_js[n] * (2 * config[nbr_idx[n]] - 1)
+                s_i = 2 * config[i] - 1
+                del_e = -s_i * field
+
+                if del_e <= 0.0 or xoroshiro128p_uniform_float64(rng_states, gid) <= math.exp(-del_e / T):
+                    config[i] = 1 - config[i]
+                    del_E += del_e
+                    del_M -= 2 * s_i
+            cuda.syncthreads()
+
+        cuda.atomic.add(em, 0, del_E)
+        cuda.atomic.add(em, 1, del_M)
+        cuda.syncthreads()
+        if tid == 0 and si >= nburn:
+            sums[r, 0] += em[0]
+            sums[r, 1] += em[0] * em[0]
+            sums[r, 2] += em[1]
+            sums[r, 3] += em[1] * em[1]
+        cuda.syncthreads()
+
+
+def metropolis_montecarlo_gpu(ham, T, nsweep=1000, nburn=100, confs=None, threads_per_block=32, seed=1):
+    """Run independent Metropolis replicas, one per temperature, on a CUDA device
+
+    Parameters
+    ----------
+    ham: IsingHamiltonian, required
+    T: list, required
+        Temperature of each replica
+    nsweep: int, optional
+        Number of sweeps accumulated
+    nburn: int, optional
+        Number of thermalization sweeps
+    confs: BitStringBatch, optional
+        configurations to start from, updated in place;
+        random configurations are used if not given
+    threads_per_block: int, optional
+        Threads sharing the sites of one replica
+    seed: int, optional
+        Seed of the device random number generators
+
+    Returns
+    -------
+    E  : np.array
+        Energy of each replica
+    M  : np.array
+        Magnetization of each replica
+    HC : np.array
+        Heat Capacity of each replica
+    MS : np.array
+        Magnetic Susceptability of each replica
+    """
+    if not cuda.is_available():
+        raise RuntimeError("no CUDA device available")
+
+    T = np.asarray(T, dtype=np.float64)
+    R = len(T)
+    if confs is None:
+        confs = BitStringBatch(R, ham.N)
+        confs.set_rand_config()
+    if confs.R != R or confs.N != ham.N:
+        raise ValueError("confs is %i x %i but T and ham need %i x %i" % (confs.R, confs.N, R, ham.N))
+
+    E0 = ham.energy_batch(confs)
+    M0 = confs.get_magnetization().astype(np.float64)
+    color_ptr, color_sites = greedy_coloring(ham)
+
+    d_configs = cuda.to_device(confs.configs)
+    d_sums = cuda.to_device(np.zeros((R, 4)))
+    rng_states = create_xoroshiro128p_states(R * threads_per_block, seed=seed)
+    # upload the read-only inputs explicitly, so the launch does not copy them back
+    inputs = [cuda.to_device(a) for a in (ham.nbr_ptr, ham.nbr_idx, ham.two_js, ham.two_mu, T,
+                                          color_ptr, color_sites, E0, M0)]
+    metropolis_replicas_kernel[R, threads_per_block](
+        d_configs, *inputs, nburn, nsweep, rng_states, d_sums
+    )
+    d_configs.copy_to_host(confs.configs)
+
+    sums = d_sums.copy_to_host() / nsweep
+    E = sums[:, 0]
+    M = sums[:, 2]
+    HC = (sums[:, 1] - E * E) / (T * T)
+    MS = (sums[:, 3] - M * M) / T
+    return E, M, HC, MS
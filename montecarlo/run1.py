@@ -1,7 +1,7 @@
 import montecarlo
 import random
 import numpy as np
-from bitstring import BitStream, BitArray
+from bitstring import BitArray
 import matplotlib
 matplotlib.use('agg')
 import matplotlib.pyplot as plt